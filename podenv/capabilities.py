@@ -18,9 +18,30 @@ This module defines the capabilities
 
 import os
 import re
-from typing import Tuple, List, Set, Optional
+from typing import FrozenSet, List, Optional, Tuple
 from podenv.context import ExecContext, Path, Capability
 
+# Host and container paths used by the capabilities
+ROOT_HOME = Path("/root")
+ROOT_XDG_DIR = Path("/run/user/0")
+DATA_DIR = Path("/data")
+TMP_DIR = Path("/tmp")
+DEV_DIR = Path("/dev")
+X11_DIR = Path("/tmp/.X11-unix")
+MACHINE_ID = Path("/etc/machine-id")
+MACHINE_ID_RO = Path("/etc/machine-id:ro")
+USER_HOME = Path("~/")
+GIT_CONFIG_DIR = Path("~/.config/git")
+GIT_CONFIG_FILE = Path("~/.gitconfig")
+NETRC_FILE = Path("~/.netrc")
+SSH_DIR = Path("~/.ssh")
+SSH_CONFIG_FILE = Path("~/.ssh/config")
+GNUPG_DIR = Path("~/.gnupg")
+SND_DEVICE = Path("/dev/snd")
+DRI_DEVICE = Path("/dev/dri")
+KVM_DEVICE = Path("/dev/kvm")
+TUN_DEVICE = Path("/dev/net/tun")
+
 
 def needUser(capability: str) -> None:
     raise RuntimeError(
@@ -31,8 +52,8 @@ def needUser(capability: str) -> None:
 def rootCap(active: bool, ctx: ExecContext) -> None:
     "run as root"
     if active:
-        ctx.home = Path("/root")
-        ctx.xdgDir = Path("/run/user/0")
+        ctx.home = ROOT_HOME
+        ctx.xdgDir = ROOT_XDG_DIR
         ctx.username = "root"
     elif ctx.user:
         ctx.home = ctx.user.home
@@ -73,7 +94,7 @@ def localNetworkCap(active: bool, ctx: ExecContext) -> None:
     # A workaround podman not configuring loopback
     if active:
         ctx.network = None
-        ctx.syscaps.append("NET_ADMIN")
+        ctx.syscaps.add("NET_ADMIN")
 
 
 def networkCap(active: bool, ctx: ExecContext) -> None:
@@ -97,7 +118,7 @@ def networkCap(active: bool, ctx: ExecContext) -> None:
 def mountCwdCap(active: bool, ctx: ExecContext) -> None:
     "mount cwd to /data"
     if active:
-        ctx.cwd = Path("/data")
+        ctx.cwd = DATA_DIR
         ctx.mounts[ctx.cwd] = Path()
 
 
@@ -108,8 +129,8 @@ def mountRunCap(active: bool, ctx: ExecContext) -> None:
             raise RuntimeError("runDir isn't set")
         if ctx.home and not ctx.mounts.get(ctx.home):
             ctx.mounts[ctx.home] = ctx.runDir / "home"
-        if not ctx.mounts.get(Path("/tmp")):
-            ctx.mounts[Path("/tmp")] = ctx.runDir / "tmp"
+        if not ctx.mounts.get(TMP_DIR):
+            ctx.mounts[TMP_DIR] = ctx.runDir / "tmp"
 
 
 def mountHomeCap(active: bool, ctx: ExecContext) -> None:
@@ -117,7 +138,7 @@ def mountHomeCap(active: bool, ctx: ExecContext) -> None:
     if active:
         if not ctx.home:
             return needUser("mount-home")
-        ctx.mounts[ctx.home] = Path("~/").expanduser()
+        ctx.mounts[ctx.home] = USER_HOME.expanduser()
 
 
 def ipcCap(active: bool, ctx: ExecContext) -> None:
@@ -129,7 +150,7 @@ def ipcCap(active: bool, ctx: ExecContext) -> None:
 def x11Cap(active: bool, ctx: ExecContext) -> None:
     "share x11 socket"
     if active:
-        ctx.mounts[Path("/tmp/.X11-unix")] = Path("/tmp/.X11-unix")
+        ctx.mounts[X11_DIR] = X11_DIR
         ctx.environ["DISPLAY"] = os.environ["DISPLAY"]
 
 
@@ -138,7 +159,7 @@ def pulseaudioCap(active: bool, ctx: ExecContext) -> None:
     if active:
         if not ctx.xdgDir:
             return needUser("pulseaudio")
-        ctx.mounts[Path("/etc/machine-id:ro")] = Path("/etc/machine-id")
+        ctx.mounts[MACHINE_ID_RO] = MACHINE_ID
         ctx.mounts[ctx.xdgDir / "pulse"] = \
             Path(os.environ["XDG_RUNTIME_DIR"]) / "pulse"
         # Force PULSE_SERVER environment so that when there are more than
@@ -146,33 +167,31 @@ def pulseaudioCap(active: bool, ctx: ExecContext) -> None:
         ctx.environ["PULSE_SERVER"] = str(ctx.xdgDir / "pulse" / "native")
 
 
+# Match the excludesfile and the credential store file of a gitconfig
+# TODO: improve git crential file discovery
+GIT_CONFIG_RE = re.compile(
+    r'^[ \t]*excludesfile[ \t]*=[ \t]*(.*?)[ \t\r]*$'
+    r'|^.*store --file.*?(\S+)[ \t\r]*$', re.M)
+
+
 def gitCap(active: bool, ctx: ExecContext) -> None:
     "share .gitconfig and excludesfile"
     if active:
         if not ctx.home:
             return needUser("git")
-        gitconfigDir = Path("~/.config/git").expanduser().resolve()
-        gitconfigFile = Path("~/.gitconfig").expanduser().resolve()
+        gitconfigDir = GIT_CONFIG_DIR.expanduser().resolve()
+        gitconfigFile = GIT_CONFIG_FILE.expanduser().resolve()
         if gitconfigDir.is_dir():
             ctx.mounts[ctx.home / ".config/git"] = gitconfigDir
         elif gitconfigFile.is_file():
             ctx.mounts[ctx.home / ".gitconfig"] = gitconfigFile
-            for line in gitconfigFile.read_text().split('\n'):
-                line = line.strip()
-                if line.startswith("excludesfile"):
-                    excludeFileName = line.split('=')[1].strip()
-                    excludeFile = Path(
-                        excludeFileName).expanduser().resolve()
-                    if excludeFile.is_file():
-                        ctx.mounts[ctx.home / excludeFileName.replace(
-                            '~/', '')] = excludeFile
-                # TODO: improve git crential file discovery
-                elif "store --file" in line:
-                    storeFileName = line.split()[-1]
-                    storeFile = Path(storeFileName).expanduser().resolve()
-                    if storeFile.is_file():
-                        ctx.mounts[ctx.home / storeFileName.replace(
-                            '~/', '')] = storeFile
+            for match in GIT_CONFIG_RE.finditer(gitconfigFile.read_text()):
+                # The last index is the group of the matching alternative
+                fileName = match.group(match.lastindex or 0)
+                filePath = Path(fileName).expanduser().resolve()
+                if filePath.is_file():
+                    ctx.mounts[ctx.home / fileName.replace(
+                        '~/', '')] = filePath
 
 
 def editorCap(active: bool, ctx: ExecContext) -> None:
@@ -186,7 +205,7 @@ def netrcCap(active: bool, ctx: ExecContext) -> None:
     if active:
         if not ctx.home:
             return needUser("netrc")
-        ctx.mounts[ctx.home / ".netrc"] = Path("~/.netrc")
+        ctx.mounts[ctx.home / ".netrc"] = NETRC_FILE
 
 
 def sshCap(active: bool, ctx: ExecContext) -> None:
@@ -194,21 +213,22 @@ def sshCap(active: bool, ctx: ExecContext) -> None:
     if active:
         if not ctx.home:
             return needUser("ssh")
-        if os.environ.get("SSH_AUTH_SOCK"):
-            ctx.environ["SSH_AUTH_SOCK"] = os.environ["SSH_AUTH_SOCK"]
-            sshSockPath = Path(os.environ["SSH_AUTH_SOCK"]).parent
-            ctx.mounts[Path(sshSockPath)] = sshSockPath
-        sshconfigFile = Path("~/.ssh/config").expanduser().resolve()
+        sshAuthSock = os.environ.get("SSH_AUTH_SOCK")
+        if sshAuthSock:
+            ctx.environ["SSH_AUTH_SOCK"] = sshAuthSock
+            sshSockPath = Path(sshAuthSock).parent
+            ctx.mounts[sshSockPath] = sshSockPath
+        sshconfigFile = SSH_CONFIG_FILE.expanduser().resolve()
         if sshconfigFile.is_file():
             for line in sshconfigFile.read_text().split('\n'):
                 line = line.strip()
                 if line.startswith("ControlPath"):
                     controlPath = Path(line.split()[1].strip().replace(
                         "%i", str(os.getuid()))).parent
-                    if controlPath.is_dir() and controlPath != Path('/tmp'):
+                    if controlPath.is_dir() and controlPath != TMP_DIR:
                         ctx.mounts[controlPath] = controlPath
 
-        ctx.mounts[ctx.home / ".ssh"] = Path("~/.ssh")
+        ctx.mounts[ctx.home / ".ssh"] = SSH_DIR
 
 
 def gpgCap(active: bool, ctx: ExecContext) -> None:
@@ -218,39 +238,37 @@ def gpgCap(active: bool, ctx: ExecContext) -> None:
             return needUser("gpg")
         gpgSockDir = Path(os.environ["XDG_RUNTIME_DIR"]) / "gnupg"
         ctx.mounts[ctx.xdgDir / "gnupg"] = gpgSockDir
-        ctx.mounts[ctx.home / ".gnupg"] = Path("~/.gnupg")
+        ctx.mounts[ctx.home / ".gnupg"] = GNUPG_DIR
 
 
 def webcamCap(active: bool, ctx: ExecContext) -> None:
     "share webcam device"
     if active:
-        for device in list(filter(lambda x: x.startswith("video"),
-                                  os.listdir("/dev"))):
-            ctx.devices.append(Path("/dev") / device)
+        ctx.devices.update(DEV_DIR.glob("video*"))
 
 
 def alsaCap(active: bool, ctx: ExecContext) -> None:
     "share alsa device"
     if active:
-        ctx.devices.append(Path("/dev/snd"))
+        ctx.devices.add(SND_DEVICE)
 
 
 def driCap(active: bool, ctx: ExecContext) -> None:
     "share graphic device"
     if active:
-        ctx.devices.append(Path("/dev/dri"))
+        ctx.devices.add(DRI_DEVICE)
 
 
 def kvmCap(active: bool, ctx: ExecContext) -> None:
     "share kvm device"
     if active:
-        ctx.devices.append(Path("/dev/kvm"))
+        ctx.devices.add(KVM_DEVICE)
 
 
 def tunCap(active: bool, ctx: ExecContext) -> None:
     "share tun device"
     if active:
-        ctx.devices.append(Path("/dev/net/tun"))
+        ctx.devices.add(TUN_DEVICE)
 
 
 def selinuxCap(active: bool, ctx: ExecContext) -> None:
@@ -268,14 +286,13 @@ def seccompCap(active: bool, ctx: ExecContext) -> None:
 def ptraceCap(active: bool, ctx: ExecContext) -> None:
     "enable ptrace"
     if active:
-        ctx.syscaps.append("SYS_PTRACE")
+        ctx.syscaps.add("SYS_PTRACE")
 
 
 def setuidCap(active: bool, ctx: ExecContext) -> None:
     "enable setuid"
     if active:
-        for cap in ("SETUID", "SETGID"):
-            ctx.syscaps.append(cap)
+        ctx.syscaps.update(("SETUID", "SETGID"))
 
 
 def foregroundCap(active: bool, ctx: ExecContext) -> None:
@@ -284,15 +301,17 @@ def foregroundCap(active: bool, ctx: ExecContext) -> None:
         # TODO: add gui dialog support for terminal-less usage
         if not ctx.commandArgs:
             raise RuntimeError("foreground capability needs command")
+        command = ";".join(ctx.commandArgs)
         ctx.commandArgs = [
             "bash", "-c",
-            "set -e; {command}; echo 'press ctrl-c to quit'; sleep Inf".format(
-                command=";".join(ctx.commandArgs)
-            )]
+            f"set -e; {command}; echo 'press ctrl-c to quit'; sleep Inf"]
+
+
+CAMEL_CASE_RE = re.compile('([A-Z]+)')
 
 
 def camelCaseToHyphen(name: str) -> str:
-    return re.sub('([A-Z]+)', r'-\1', name).lower()
+    return CAMEL_CASE_RE.sub(r'-\1', name).lower()
 
 
 Capabilities: List[Tuple[str, Optional[str], Capability]] = [
@@ -327,4 +346,11 @@ Capabilities: List[Tuple[str, Optional[str], Capability]] = [
         mountRunCap,
         uidmapCap,
     ]]
-ValidCap: Set[str] = set([cap[0] for cap in Capabilities])
+CapabilityNames: Tuple[str, ...] = tuple(cap[0] for cap in Capabilities)
+CapabilityFuncs: Tuple[Capability, ...] = tuple(
+    cap[2] for cap in Capabilities)
+ValidCap: FrozenSet[str] = frozenset(CapabilityNames)
+# The capabilities that also set the context when they are not active
+InactiveCaps: FrozenSet[Capability] = frozenset((
+    rootCap, uidmapCap, privilegedCap, largeShmCap, networkCap, selinuxCap,
+    seccompCap))
@@ -17,14 +17,15 @@ This module defines types
 """
 
 from __future__ import annotations
-import copy
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from textwrap import dedent
-from typing import Callable, Dict, List, Optional, Union
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, \
+    Tuple, Union
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Container user information"""
     name: str
@@ -32,14 +33,14 @@ class User:
     uid: int
 
 
-@dataclass
+@dataclass(slots=True)
 class File:
     """A volume file"""
     name: str
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Volume:
     """A volume information"""
     name: str
@@ -47,13 +48,41 @@ class Volume:
     files: Optional[List[File]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildContext:
     """Minimal execution context to be used for image building"""
     mounts: Optional[Dict[HostPath, ContainerPath]] = None
 
 
-@dataclass
+DESKTOP_TEMPLATE = """\
+# Generated by podenv
+[Desktop Entry]
+Type=Application
+Name=%s
+Comment=Podenv launcher for %s
+Exec=podenv %s
+Terminal=%s
+%s
+"""
+
+
+UIDMAPS = ("--uidmap", "1000:0:1", "--uidmap", "0:1:1000",
+           "--uidmap", f"1001:1001:{2**16 - 1001}")
+
+
+@lru_cache(maxsize=None)
+def _iconPath(relPath: Path, icon: str) -> Path:
+    """Look for the icon relatively to the environment, then on the host"""
+    iconPath = Path(icon)
+    for candidate in (relPath / iconPath, iconPath):
+        try:
+            return candidate.expanduser().resolve(strict=True)
+        except OSError:
+            continue
+    return iconPath
+
+
+@dataclass(slots=True)
 class DesktopEntry:
     """A desktop file definition"""
     envName: str
@@ -64,34 +93,32 @@ class DesktopEntry:
 
     def format(self) -> str:
         if self.icon:
-            if (self.relPath / self.icon).exists():
-                iconPath = (self.relPath / self.icon).expanduser().resolve()
-            elif Path(self.icon).exists():
-                iconPath = Path(self.icon).expanduser().resolve()
-            else:
-                iconPath = Path(self.icon)
-            icon = f"Icon={iconPath}"
+            icon = f"Icon={_iconPath(self.relPath, self.icon)}"
         else:
             icon = ""
         terminal = "true" if self.terminal else "false"
 
-        return dedent(f"""
-            # Generated by podenv
-            [Desktop Entry]
-            Type=Application
-            Name={self.name}
-            Comment=Podenv launcher for {self.envName}
-            Exec=podenv {self.envName}
-            Terminal={terminal}
-            {icon}
-        """[1:])
+        return DESKTOP_TEMPLATE % (
+            self.name, self.envName, self.envName, terminal, icon)
 
     def __post_init__(self) -> None:
         if not self.name:
             self.name = f"podenv - {self.envName}"
 
 
-@dataclass
+@lru_cache(maxsize=1024)
+def _resolve(path: Path) -> str:
+    """Resolve a host path once per process"""
+    return str(path.expanduser().resolve())
+
+
+def _hostPath(hostMount: Union[Path, Volume]) -> str:
+    if isinstance(hostMount, Path):
+        return _resolve(hostMount)
+    return f"{hostMount.name}"
+
+
+@dataclass(slots=True)
 class ExecContext:
     """The intermediary execution context representation"""
     name: str
@@ -106,9 +133,9 @@ class ExecContext:
     # Following collections are optionals and set to empty value by default
     environ: Dict[str, str] = field(default_factory=dict)
     mounts: Dict[Path, Union[Path, Volume]] = field(default_factory=dict)
-    syscaps: List[str] = field(default_factory=list)
-    sysctls: List[str] = field(default_factory=list)
-    devices: List[Path] = field(default_factory=list)
+    syscaps: Set[str] = field(default_factory=set)
+    sysctls: Set[str] = field(default_factory=set)
+    devices: Set[Path] = field(default_factory=set)
     addHosts: Dict[str, str] = field(default_factory=dict)
     hostPreTasks: List[str] = field(default_factory=list)
     hostPostTasks: List[str] = field(default_factory=list)
@@ -137,91 +164,107 @@ class ExecContext:
     privileged: bool = False
     uidmaps: bool = False
 
+    # The last getArgs result with the state it was computed from
+    _argsCache: Optional[Tuple[Tuple[Any, ...], ExecArgs]] = field(
+        default=None, init=False, repr=False, compare=False)
+
     def getUidMaps(self) -> ExecArgs:
-        return ["--uidmap", "1000:0:1", "--uidmap", "0:1:1000",
-                "--uidmap", "1001:1001:%s" % (2**16 - 1001)]
+        return list(UIDMAPS)
 
     def hasNetwork(self) -> bool:
-        return not self.namespaces.get("network") or \
-            self.namespaces["network"] != "none"
+        return self.namespaces.get("network") != "none"
 
     def hasDirectNetwork(self) -> bool:
-        return not self.namespaces.get("network") or \
-            self.namespaces["network"] == "host"
+        network = self.namespaces.get("network")
+        return not network or network == "host"
 
     def getHosts(self) -> ExecArgs:
-        args = []
-        for hostName, hostIp in self.addHosts.items():
-            args.extend(["--add-host", f"{hostName}:{hostIp}"])
-        return args
+        return list(chain.from_iterable(
+            ("--add-host", f"{hostName}:{hostIp}")
+            for hostName, hostIp in self.addHosts.items()))
+
+    def _argsKey(self) -> Tuple[Any, ...]:
+        """The attributes used by getArgs"""
+        return (
+            tuple(self.podmanArgs), self.hostname, self.seLinuxLabel,
+            self.seccomp, tuple(self.namespaces.items()),
+            tuple(self.addHosts.items()), self.cwd, self.dns,
+            tuple((containerPath, hostPath if isinstance(hostPath, Path)
+                   else hostPath.name)
+                  for containerPath, hostPath in self.mounts.items()),
+            frozenset(self.devices), frozenset(self.syscaps),
+            frozenset(self.sysctls),
+            self.xdgDir, tuple(self.environ.items()), self.username,
+            self.uidmaps, self.privileged, self.detachKeys, self.interactive,
+            self.shmsize)
 
     def getArgs(self) -> ExecArgs:
-        args = copy.copy(self.podmanArgs)
+        key = self._argsKey()
+        if self._argsCache is None or self._argsCache[0] != key:
+            self._argsCache = (key, list(self.iterArgs()))
+        return list(self._argsCache[1])
+
+    def iterArgs(self) -> Iterator[str]:
+        """Generate the podman run arguments"""
+        yield from self.podmanArgs
 
         if self.hostname:
-            args.extend(["--hostname", self.hostname])
+            yield from ("--hostname", self.hostname)
 
         if self.seLinuxLabel:
-            args.extend(["--security-opt", f"label={self.seLinuxLabel}"])
+            yield from ("--security-opt", f"label={self.seLinuxLabel}")
         if self.seccomp:
-            args.extend(["--security-opt", f"seccomp={self.seccomp}"])
+            yield from ("--security-opt", f"seccomp={self.seccomp}")
 
-        for ns, val in self.namespaces.items():
-            args.extend([f"--{ns}", val])
+        yield from chain.from_iterable(
+            (f"--{ns}", val) for ns, val in self.namespaces.items())
 
-        if self.hasDirectNetwork():
-            args.extend(self.getHosts())
+        directNetwork = self.hasDirectNetwork()
+        if directNetwork:
+            yield from self.getHosts()
 
         if self.cwd:
-            args.extend(["--workdir", str(self.cwd)])
+            yield from ("--workdir", str(self.cwd))
 
-        if self.dns and self.hasDirectNetwork():
-            args.append(f"--dns={self.dns}")
+        if self.dns and directNetwork:
+            yield f"--dns={self.dns}"
 
-        for mount in sorted(self.mounts.keys()):
-            hostMount = self.mounts[mount]
-            if isinstance(hostMount, Path):
-                hostPath = str(hostMount.expanduser().resolve())
-            else:
-                hostPath = f"{hostMount.name}"
-            args.extend(["-v", "{hostPath}:{containerPath}".format(
-                hostPath=hostPath,
-                containerPath=mount)])
+        yield from chain.from_iterable(
+            ("-v", f"{_hostPath(hostMount)}:{mount}")
+            for mount, hostMount in sorted(self.mounts.items()))
 
-        for device in set(self.devices):
-            args.extend(["--device", str(device)])
+        yield from chain.from_iterable(
+            ("--device", str(device)) for device in sorted(self.devices))
 
-        for cap in set(self.syscaps):
-            args.extend(["--cap-add", cap])
+        yield from chain.from_iterable(
+            ("--cap-add", cap) for cap in sorted(self.syscaps))
 
-        for ctl in set(self.sysctls):
-            args.extend(["--sysctl", ctl])
+        yield from chain.from_iterable(
+            ("--sysctl", ctl) for ctl in sorted(self.sysctls))
 
         if self.xdgDir:
-            args.extend(["-e", f"XDG_RUNTIME_DIR={self.xdgDir}"])
+            yield from ("-e", f"XDG_RUNTIME_DIR={self.xdgDir}")
 
-        for e, v in sorted(self.environ.items()):
-            args.extend(["-e", "%s=%s" % (e, v)])
+        yield from chain.from_iterable(
+            ("-e", f"{e}={v}") for e, v in sorted(self.environ.items()))
 
         if self.username:
-            args.extend(["--user", self.username])
+            yield from ("--user", self.username)
 
         if self.uidmaps:
-            args.extend(self.getUidMaps())
+            yield from UIDMAPS
 
         if self.privileged:
-            args.extend(["--privileged"])
+            yield "--privileged"
 
         if self.detachKeys is not None:
-            args.extend(["--detach-keys", self.detachKeys])
+            yield from ("--detach-keys", self.detachKeys)
 
         if self.interactive:
-            args.extend(["-it"])
+            yield "-it"
 
         if self.shmsize:
-            args.extend([f"--shm-size={self.shmsize}"])
-
-        return args
+            yield f"--shm-size={self.shmsize}"
 
 
 HostPath = Path
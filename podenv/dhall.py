@@ -16,66 +16,239 @@
 This module interfaces with dhall-lang
 """
 
-import json
+import os
+from functools import lru_cache
+from hashlib import sha256
 from pathlib import Path
-from subprocess import Popen, PIPE
-from typing import Any, Dict, Optional, Union
+from subprocess import Popen, PIPE, run
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    from orjson import (  # type: ignore[import-not-found, unused-ignore]
+        loads as jsonLoads)
+except ImportError:
+    from json import (  # type: ignore[assignment, unused-ignore]
+        loads as jsonLoads)
 
 DEFAULT_PATH = Path("~/.local/bin/dhall-to-json").expanduser()
 DEFAULT_URL = "https://github.com/dhall-lang/dhall-haskell/releases/download/"\
     "1.30.0/dhall-json-1.6.2-x86_64-linux.tar.bz2"
 DEFAULT_HASH = \
     "ea37627c4e19789af33def099d4cb145b874c03b4d5b98cb33ce06be1debf4f3"
+CACHE_DIR = Path("~/.cache/podenv/dhall").expanduser()
+CACHE_SIZE = 32
 
 Input = Union[Path, str]
 Env = Optional[Dict[str, str]]
 
+# The resolved dhall-to-json command, reset when it gets installed
+_command: Optional[str] = None
+
+
+def _getCommand() -> str:
+    global _command
+    if _command is None:
+        _command = str(
+            DEFAULT_PATH if DEFAULT_PATH.exists() else "dhall-to-json")
+    return _command
+
 
 def _install() -> None:
     # TODO: implement opt-out
+    global _command
     import urllib.request
-    from hashlib import sha256
-
-    req = urllib.request.urlopen(DEFAULT_URL)
-    data = req.read()
-    digest = sha256(data).hexdigest()
-    if digest != DEFAULT_HASH:
-        raise RuntimeError(
-            f"{DEFAULT_URL}: expected '{DEFAULT_HASH}' got '{digest}")
+    from tempfile import TemporaryDirectory
+
     DEFAULT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    p = Popen(["tar", "-xjf", "-", "--strip-components=2",
-               "-C", str(DEFAULT_PATH.parent)],
-              stdin=PIPE)
-    p.communicate(data)
-    if p.wait():
-        raise RuntimeError(f"{DEFAULT_URL}: couldn't extract")
+    # Extract while downloading, files are only installed once verified
+    with TemporaryDirectory(dir=DEFAULT_PATH.parent) as tmpDir:
+        h = sha256()
+        p = Popen(["tar", "-xjf", "-", "--strip-components=2",
+                   "-C", tmpDir],
+                  stdin=PIPE)
+        assert p.stdin is not None
+        piped = True
+        try:
+            with urllib.request.urlopen(DEFAULT_URL) as req:
+                for chunk in iter(lambda: req.read(65536), b""):
+                    h.update(chunk)
+                    if piped:
+                        try:
+                            p.stdin.write(chunk)
+                        except BrokenPipeError:
+                            # tar exited early, keep hashing the download
+                            piped = False
+        finally:
+            try:
+                p.stdin.close()
+            except BrokenPipeError:
+                pass
+            extracted = p.wait() == 0
+        digest = h.hexdigest()
+        if digest != DEFAULT_HASH:
+            raise RuntimeError(
+                f"{DEFAULT_URL}: expected '{DEFAULT_HASH}' got '{digest}")
+        if not extracted:
+            raise RuntimeError(f"{DEFAULT_URL}: couldn't extract")
+        for path in Path(tmpDir).iterdir():
+            path.replace(DEFAULT_PATH.parent / path.name)
+    _command = None
 
 
-def _load(input: Input, env: Env = None, debug: bool = False) -> Any:
-    cmd = [str(DEFAULT_PATH if DEFAULT_PATH.exists() else "dhall-to-json")]
-    if debug:
-        cmd.append("--explain")
-    if env and not env.get('PATH'):
-        env['PATH'] = ':'.join(['/bin', '/usr/local/bin'])
+@lru_cache(maxsize=None)
+def _version() -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        return version("podenv")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _hashTree(h: Any, root: Path) -> None:
+    """Hash the path and mtime of every dhall file below root"""
+    for path in sorted(root.rglob("*.dhall")):
+        try:
+            mtime = path.lstat().st_mtime_ns
+        except OSError:
+            continue
+        h.update(f"\0{path}={mtime}".encode('utf-8'))
+
+
+def _cacheKey(input: Input, env: Env, debug: bool) -> Optional[str]:
+    """Hash the evaluation inputs.
+
+    The imports are tracked through the mtime of the dhall files found
+    in the podenv package and in the directory of the environment paths,
+    such as the hub package. Other imports are not tracked, set
+    PODENV_NO_CACHE to force the evaluation."""
+    h = sha256()
+    h.update(_version().encode('utf-8'))
+    roots = {Path(__file__).parent / "dhall"}
     if isinstance(input, str):
-        proc = Popen(
-            cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE, env=env)
-        proc.stdin.write(input.encode('utf-8'))
+        h.update(input.encode('utf-8'))
+    elif input.is_file():
+        h.update(str(input.resolve()).encode('utf-8'))
+        h.update(input.read_bytes())
     else:
-        proc = Popen(
-            cmd + ["--file", str(input)], stdout=PIPE, stderr=PIPE, env=env)
-    stdout, stderr = proc.communicate()
-    if stderr:
-        raise RuntimeError(f"Dhall error:" + stderr.decode('utf-8'))
-    return json.loads(stdout.decode('utf-8'))
+        return None
+    # Never walk these directories, they are not packages
+    unrelated = {Path.home().resolve(), Path.cwd().resolve()}
+    for key, value in sorted((env or {}).items()):
+        h.update(f"\0{key}={value}".encode('utf-8'))
+        path = Path(value)
+        if path.is_absolute() and path.is_file():
+            h.update(str(path.stat().st_mtime_ns).encode('utf-8'))
+            if path.resolve().parent not in unrelated:
+                roots.add(path.resolve().parent)
+    for root in sorted(roots):
+        _hashTree(h, root)
+    if debug:
+        h.update(b"\0--explain")
+    return h.hexdigest()
 
 
-def load(input: Input, env: Env = None, debug: bool = False) -> Any:
+def _pruneCache() -> None:
+    """Remove the least recently used entries"""
+    entries = []
+    for path in CACHE_DIR.iterdir():
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    for _, path in sorted(entries, reverse=True)[CACHE_SIZE:]:
+        path.unlink(missing_ok=True)
+
+
+def _evaluate(input: Input, env: Env, debug: bool) -> bytes:
+    args = ["--explain"] if debug else []
+    stdin: Optional[bytes] = None
+    if isinstance(input, str):
+        stdin = input.encode('utf-8')
+    else:
+        args += ["--file", str(input)]
+    if env and not env.get('PATH'):
+        env['PATH'] = ':'.join(['/bin', '/usr/local/bin'])
     try:
-        return _load(input, env, debug)
+        proc = run([_getCommand()] + args, input=stdin,
+                   stdout=PIPE, stderr=PIPE, env=env)
     except FileNotFoundError:
         _install()
-        return _load(input, env, debug)
+        proc = run([_getCommand()] + args, input=stdin,
+                   stdout=PIPE, stderr=PIPE, env=env)
+    if proc.returncode:
+        raise RuntimeError(f"Dhall error:" + proc.stderr.decode('utf-8'))
+    # The output is kept as a single bytes buffer, without a streaming
+    # parser, because it is also written as-is to the cache.
+    return proc.stdout
+
+
+@lru_cache(maxsize=256)
+def _cachedEvaluate(input: Input, mtime: int,
+                    environ: Optional[Tuple[Tuple[str, str], ...]],
+                    debug: bool) -> bytes:
+    return _evaluate(
+        input, dict(environ) if environ is not None else None, debug)
+
+
+def _memoizedEvaluate(input: Input, env: Env, debug: bool) -> bytes:
+    # The file mtime is part of the key to pick up modifications
+    mtime = 0
+    if isinstance(input, Path) and input.is_file():
+        input = input.resolve()
+        mtime = input.stat().st_mtime_ns
+    environ = tuple(sorted(env.items())) if env is not None else None
+    return _cachedEvaluate(input, mtime, environ, debug)
+
+
+def _load(input: Input, env: Env = None, debug: bool = False) -> Any:
+    cacheKey = None
+    if not os.environ.get("PODENV_NO_CACHE"):
+        cacheKey = _cacheKey(input, env, debug)
+    if cacheKey:
+        cacheFile = CACHE_DIR / cacheKey
+        if cacheFile.exists():
+            try:
+                result = jsonLoads(cacheFile.read_bytes())
+            except (OSError, ValueError):
+                # Discard an unreadable entry and evaluate again
+                cacheFile.unlink(missing_ok=True)
+            else:
+                # Mark the entry as recently used for the pruning
+                try:
+                    os.utime(cacheFile)
+                except OSError:
+                    pass
+                return result
+    # The raw output is memoized, parsing it gives the caller a fresh object
+    raw = _memoizedEvaluate(input, env, debug)
+    result = jsonLoads(raw)
+    if cacheKey:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmpFile = CACHE_DIR / f"{cacheKey}.{os.getpid()}.tmp"
+        tmpFile.write_bytes(raw)
+        tmpFile.rename(cacheFile)
+        _pruneCache()
+    return result
+
+
+def load(input: Input, env: Env = None, debug: bool = False) -> Any:
+    return _load(input, env, debug)
+
+
+def loadMany(exprs: List[str], env: Env = None, debug: bool = False
+             ) -> List[Any]:
+    """Evaluate a list of expressions using a single dhall-to-json process"""
+    if not exprs:
+        return []
+    record = "{ " + ", ".join(
+        f"_{idx} = (\n{expr}\n)" for idx, expr in enumerate(exprs)) + " }"
+    try:
+        result = load(record, env, debug)
+    except RuntimeError:
+        # Evaluate each expression to report the faulty one
+        return [load(expr, env, debug) for expr in exprs]
+    # dhall-to-json omits null fields
+    return [result.get(f"_{idx}") for idx in range(len(exprs))]
 
 
 if __name__ == "__main__":
@@ -37,8 +37,17 @@ HostName = str
 HostIP = str
 Hosts = Dict[HostName, HostIP]
 
+# The schema keys renamed to their Env attribute name
+CamelCaseKeys: Dict[str, str] = {
+    "pre-tasks": "preTasks",
+    "post-tasks": "postTasks",
+    "work-dir": "workDir",
+    "container-file": "containerFile",
+    "container-update": "containerUpdate",
+}
 
-@dataclass
+
+@dataclass(slots=True)
 class Env:
     """The user provided container representation"""
     name: str = field(metadata=dict(
@@ -115,19 +124,23 @@ class Env:
     def __repr__(self) -> str:
         # Format object by removing null attribute
         activeFields: List[str] = []
-        for f in fields(Env):
-            if f.metadata \
-               and not f.metadata.get('internal', False):
-                value = str(self.__dict__[f.name])
-                if value:
-                    if '\n' in value:
-                        value = f'"""{value}"""'
-                    elif ' ' in value:
-                        value = f'"{value}"'
-                    activeFields.append(f"{f.name}={value}")
+        for name in EnvReprFields:
+            value = str(getattr(self, name))
+            if value:
+                if '\n' in value:
+                    value = f'"""{value}"""'
+                elif ' ' in value:
+                    value = f'"{value}"'
+                activeFields.append(f"{name}={value}")
         return "Env(%s)" % ", ".join(activeFields)
 
 
+# The user provided attributes, computed once for Env.__repr__
+EnvReprFields: Tuple[str, ...] = tuple(
+    f.name for f in fields(Env)
+    if f.metadata and not f.metadata.get('internal', False))
+
+
 def loadEnv(schema: Any, debug: bool = False) -> Env:
     """Convert input config to python Env object"""
 
@@ -166,19 +179,17 @@ def loadEnv(schema: Any, debug: bool = False) -> Env:
                 if isinstance(schema[key], list) else [schema[key]]))
 
     if schema.get('updateFileStr'):
-        if any(filter(lambda x: str(x).startswith("FROM "),
-                      schema['updateFileStr'].split('\n'))):
+        updateFileStr = schema['updateFileStr']
+        # Look for a line starting with FROM in a single scan
+        if updateFileStr.startswith("FROM ") or "\nFROM " in updateFileStr:
             raise RuntimeError("{schema['name']}: container-update "
                                "can't have FROM statement")
         schema['updateFileStr'] = f"FROM {schema['image']}\n" + schema[
             'updateFileStr']
 
     # Convert to camelCase
-    for key in ("pre-tasks", "post-tasks", "work-dir",
-                "container-file", "container-update"):
+    for key, camelKey in CamelCaseKeys.items():
         if schema.get(key):
-            x, xs = key.split('-', 1)
-            camelKey = x + ''.join(map(str.capitalize, xs.split('-')))
             schema[camelKey] = schema.pop(key)
 
     # Transform complex types
@@ -225,7 +236,7 @@ def loadEnv(schema: Any, debug: bool = False) -> Env:
     def asList(obj: Union[str, List[str]]) -> List[str]:
         if isinstance(obj, str):
             return shlex.split(obj)
-        return list(map(str, obj))
+        return [str(arg) for arg in obj]
 
     if schema.get("mounts"):
         if isinstance(schema["mounts"], list):
@@ -268,20 +279,24 @@ def validateEnv(env: Env, ctx: ExecContext) -> None:
     def warn(msg: str) -> None:
         print(f"\033[93m{msg}\033[m", file=stderr)
 
+    caps = env.capabilities
+    selinuxActive = caps.get("selinux")
+    uidmapActive = caps.get("uidmap")
+
     # Check if SELinux will block socket access
-    if env.capabilities.get("selinux"):
+    if selinuxActive:
         for cap in ("x11", "tun", "pulseaudio"):
-            if env.capabilities.get(cap):
+            if caps.get(cap):
                 warn(
                     f"SELinux is disabled because capability '{cap}' need "
                     "extra type enforcement that are not currently supported.")
                 Cap.selinuxCap(False, ctx)
-                env.capabilities["selinux"] = False
+                caps["selinux"] = selinuxActive = False
 
     # Check for uid permissions
-    if not env.capabilities.get("root") and not env.capabilities.get("uidmap"):
+    if not caps.get("root") and not uidmapActive:
         for cap in ("x11", "pulseaudio", "ssh", "gpg"):
-            if env.capabilities.get(cap):
+            if caps.get(cap):
                 warn(
                     f"UIDMap is required because '{cap}' need "
                     "DAC access to the host file")
@@ -289,38 +304,41 @@ def validateEnv(env: Env, ctx: ExecContext) -> None:
                 break
 
     # Check for system capabilities
-    if env.capabilities.get("tun") and "NET_ADMIN" not in ctx.syscaps:
+    if caps.get("tun") and "NET_ADMIN" not in ctx.syscaps:
         warn(f"NET_ADMIN capability is needed by the tun device")
-        ctx.syscaps.append("NET_ADMIN")
+        ctx.syscaps.add("NET_ADMIN")
+
+    # Resolve the mount points host path once for the following checks
+    resolvedPaths = {
+        containerPath: hostPath.expanduser().resolve()
+        for containerPath, hostPath in ctx.mounts.items()
+        if not isinstance(hostPath, Volume)}
 
     # Check mount points labels
-    if env.capabilities.get("selinux") and HAS_SELINUX:
+    if selinuxActive and HAS_SELINUX:
         label = "container_file_t"
-        for hostPath in ctx.mounts.values():
-            if isinstance(hostPath, Volume):
-                continue
-            hostPath = hostPath.expanduser().resolve()
-            if hostPath.exists() and \
-               selinux.getfilecon(str(hostPath))[1].split(':')[2] != label:
-                warn(f"SELinux is disabled because {hostPath} doesn't have "
-                     f"the {label} label. To set the label run: "
-                     f"chcon -Rt {label} {hostPath}")
+        for resolvedPath in resolvedPaths.values():
+            if resolvedPath.exists() and selinux.getfilecon(
+                    str(resolvedPath))[1].split(':')[2] != label:
+                warn(f"SELinux is disabled because {resolvedPath} doesn't "
+                     f"have the {label} label. To set the label run: "
+                     f"chcon -Rt {label} {resolvedPath}")
                 Cap.selinuxCap(False, ctx)
 
     # Check mount points permissions
-    for hostPath in ctx.mounts.values():
+    for containerPath, hostPath in ctx.mounts.items():
         if isinstance(hostPath, Volume):
-            if not hostPath.readOnly and not env.capabilities.get("uidmap"):
+            if not hostPath.readOnly and not uidmapActive:
                 warn("UIDMap is required for rw volume")
                 Cap.uidmapCap(True, ctx)
                 break
             continue
-        hostPath = hostPath.expanduser().resolve()
-        if hostPath.exists() and not os.access(str(hostPath), os.R_OK):
-            warn(f"{hostPath} is not readable by the current user.")
+        resolvedPath = resolvedPaths[containerPath]
+        if resolvedPath.exists() and \
+           not os.access(str(resolvedPath), os.R_OK):
+            warn(f"{resolvedPath} is not readable by the current user.")
 
-    if env.capabilities.get("mount-home") and not env.capabilities.get(
-            "uidmap"):
+    if caps.get("mount-home") and not uidmapActive:
         warn("UIDMap is required for mount-home")
         Cap.uidmapCap(True, ctx)
 
@@ -344,17 +362,18 @@ def prepareEnv(env: Env, cliArgs: List[str]) -> ExecContext:
         containerUpdate=env.updateFileStr,
     )
     # Apply capabilities
-    for name, _, capability in Cap.Capabilities:
-        capability(env.capabilities.get(name, False), ctx)
+    for name, capability in zip(Cap.CapabilityNames, Cap.CapabilityFuncs):
+        active = env.capabilities.get(name, False)
+        if active or capability in Cap.InactiveCaps:
+            capability(active, ctx)
 
     # Add local env attribute to the execution context
     if env.ports:
-        for port in env.ports:
-            ctx.podmanArgs.append(f"--publish={port}")
+        ctx.podmanArgs += (f"--publish={port}" for port in env.ports)
     if env.syscaps:
-        ctx.syscaps.extend(env.syscaps)
+        ctx.syscaps.update(env.syscaps)
     if env.sysctls:
-        ctx.sysctls.extend(env.sysctls)
+        ctx.sysctls.update(env.sysctls)
     if env.environ:
         ctx.environ.update(env.environ)
     if env.addHosts:
@@ -415,8 +434,7 @@ def prepareEnv(env: Env, cliArgs: List[str]) -> ExecContext:
 
     # Only use cli args when env isn't a shell
     if not ctx.commandArgs or ctx.commandArgs[-1] != "/bin/bash":
-        for arg in cliArgs:
-            ctx.commandArgs.append(arg)
+        ctx.commandArgs.extend(cliArgs)
 
     # Manage pre/post tasks
     if env.preTasks:
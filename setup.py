@@ -25,6 +25,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/podenv/podenv",
     packages=["podenv"],
+    python_requires=">=3.10",
     install_requires=["PyYAML"],
     package_data={'podenv': [
         item[7:] for sub in map(lambda x: [x[0]] + list(map(
@@ -0,0 +1,75 @@
+# Copyright 2019 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from podenv.capabilities import (
+    Capabilities, GIT_CONFIG_RE, InactiveCaps, gitCap)
+from podenv.context import ExecContext
+
+
+class TestCapabilities(TestCase):
+    def test_inactive_caps(self):
+        for name, _, capability in Capabilities:
+            if capability in InactiveCaps:
+                continue
+            ctx = ExecContext("test", "test", None, None, [])
+            capability(False, ctx)
+            self.assertEqual(
+                ctx, ExecContext("test", "test", None, None, []), name)
+
+    def gitMounts(self, gitConfig):
+        with TemporaryDirectory() as home:
+            (Path(home) / ".gitconfig").write_bytes(gitConfig.encode())
+            (Path(home) / "x").write_text("x")
+            (Path(home) / "y").write_text("y")
+            ctx = ExecContext("test", "test", None, None, [])
+            ctx.home = Path("/home/user")
+            with patch.dict(os.environ, HOME=home):
+                gitCap(True, ctx)
+            return {str(containerPath): str(hostPath.relative_to(
+                Path(home).resolve()))
+                for containerPath, hostPath in ctx.mounts.items()}
+
+    def test_git_config(self):
+        for newline in ("\n", "\r\n"):
+            self.assertEqual(self.gitMounts(newline.join([
+                "[core]",
+                "\texcludesfile = ~/x",
+                "[credential]",
+                "\thelper = store --file ~/y",
+                "[user]",
+                "\tname = user",
+                "",
+            ])), {"/home/user/.gitconfig": ".gitconfig",
+                  "/home/user/x": "x",
+                  "/home/user/y": "y"})
+
+    def test_git_config_no_value(self):
+        self.assertEqual(self.gitMounts("[core]\n\texcludesfile =\n"),
+                         {"/home/user/.gitconfig": ".gitconfig"})
+
+    def test_git_config_crlf(self):
+        # gitCap reads the file with universal newlines, the pattern
+        # also doesn't capture the carriage return of a raw content
+        self.assertEqual(
+            [match.group(match.lastindex or 0) for match in
+             GIT_CONFIG_RE.finditer(
+                 "excludesfile = ~/x\r\nhelper = store --file ~/y\r\n")],
+            ["~/x", "~/y"])
@@ -0,0 +1,119 @@
+# Copyright 2019 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import podenv.dhall
+
+
+class TestDhallCache(TestCase):
+    def setUp(self):
+        self.tmpDir = TemporaryDirectory()
+        self.addCleanup(self.tmpDir.cleanup)
+        cacheDir = Path(self.tmpDir.name)
+        patcher = patch.object(podenv.dhall, "CACHE_DIR", cacheDir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        podenv.dhall._cachedEvaluate.cache_clear()
+
+    def test_cache_key(self):
+        key = podenv.dhall._cacheKey
+        self.assertEqual(key("True", None, False), key("True", None, False))
+        self.assertNotEqual(
+            key("True", None, False), key("False", None, False))
+        self.assertNotEqual(
+            key("True", None, False), key("True", dict(HOME="/"), False))
+        self.assertNotEqual(key("True", None, False), key("True", None, True))
+        self.assertIsNone(key(Path(self.tmpDir.name) / "missing", None, False))
+
+    def test_cache_key_imports(self):
+        key = podenv.dhall._cacheKey
+        with TemporaryDirectory() as hubDir:
+            package = Path(hubDir) / "package.dhall"
+            package.write_text("./env.dhall")
+            env = Path(hubDir) / "envs" / "env.dhall"
+            env.parent.mkdir()
+            env.write_text("True")
+            hub = dict(PODENV_HUB=str(package))
+            before = key("True", hub, False)
+            os.utime(env, ns=(0, 0))
+            self.assertNotEqual(before, key("True", hub, False))
+
+    def test_cache_key_broken_link(self):
+        with TemporaryDirectory() as hubDir:
+            package = Path(hubDir) / "package.dhall"
+            package.write_text("True")
+            (Path(hubDir) / "broken.dhall").symlink_to("/nonexistent.dhall")
+            self.assertIsNotNone(podenv.dhall._cacheKey(
+                "True", dict(PODENV_HUB=str(package)), False))
+
+    def test_cache_prune(self):
+        with patch.object(podenv.dhall, "run") as run:
+            run.return_value.returncode = 0
+            run.return_value.stdout = b"true"
+            for idx in range(podenv.dhall.CACHE_SIZE + 2):
+                podenv.dhall.load(f"{idx} == {idx}")
+        self.assertEqual(len(list(podenv.dhall.CACHE_DIR.iterdir())),
+                         podenv.dhall.CACHE_SIZE)
+
+    def test_cache_hit(self):
+        expr = '{ name = "cached" }'
+        cacheKey = podenv.dhall._cacheKey(expr, None, False)
+        (podenv.dhall.CACHE_DIR / cacheKey).write_text('{"name": "cached"}')
+        with patch.object(podenv.dhall, "run") as run:
+            self.assertEqual(podenv.dhall.load(expr), dict(name="cached"))
+            run.assert_not_called()
+
+    def test_cache_invalid_entry(self):
+        expr = '{ name = "invalid" }'
+        cacheFile = podenv.dhall.CACHE_DIR / podenv.dhall._cacheKey(
+            expr, None, False)
+        cacheFile.write_text("not json")
+        with patch.object(podenv.dhall, "run") as run:
+            run.return_value.returncode = 0
+            run.return_value.stdout = b'{"name": "invalid"}'
+            self.assertEqual(podenv.dhall.load(expr), dict(name="invalid"))
+            run.assert_called_once()
+        self.assertEqual(cacheFile.read_text(), '{"name": "invalid"}')
+
+    def test_cache_unparsable_output(self):
+        expr = '{ name = "unparsable" }'
+        with patch.object(podenv.dhall, "run") as run:
+            run.return_value.returncode = 0
+            run.return_value.stdout = b"not json"
+            with self.assertRaises(ValueError):
+                podenv.dhall.load(expr)
+        self.assertEqual(list(podenv.dhall.CACHE_DIR.iterdir()), [])
+
+    @patch.dict(os.environ, PODENV_NO_CACHE="1")
+    def test_memoization(self):
+        with patch.object(podenv.dhall, "_evaluate") as load:
+            load.return_value = b'{"name": "memoized"}'
+            first = podenv.dhall.load("{ name = \"memoized\" }")
+            first["name"] = "modified"
+            second = podenv.dhall.load("{ name = \"memoized\" }")
+            self.assertEqual(second, dict(name="memoized"))
+            load.assert_called_once()
+
+    def test_load_many(self):
+        with patch.object(podenv.dhall, "_load") as load:
+            load.return_value = {"_0": "a", "_2": 2}
+            self.assertEqual(
+                podenv.dhall.loadMany(['"a"', "None Text", "2"]),
+                ["a", None, 2])
+            load.assert_called_once()
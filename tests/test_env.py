@@ -47,3 +47,10 @@ class TestConfig(TestCase):
         ctx = podenv.env.prepareEnv(env, [])
         execCommand = " ".join(ctx.getArgs())
         self.assertIn("-v git:/home/user/git", execCommand)
+
+    def test_args_cache(self):
+        env = fakeEnv("test-env", dict(capabilities=dict(root=True)))
+        ctx = podenv.env.prepareEnv(env, [])
+        self.assertEqual(ctx.getArgs(), ctx.getArgs())
+        ctx.environ["PORT"] = "4242"
+        self.assertIn("PORT=4242", ctx.getArgs())